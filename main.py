@@ -19,6 +19,7 @@ import asyncio
 import aiofiles
 import csv
 import json
+import zlib
 from datetime import datetime, timezone
 from collections import Counter, defaultdict
 import statistics
@@ -72,6 +73,12 @@ from serverlog_analyser.jobs import JobManager
 # instantiate job manager
 job_manager = JobManager()
 
+# When JOB_QUEUE_PATH is set, the API only enqueues jobs into the shared SQLite queue and
+# separate worker processes (`python -m serverlog_analyser worker`) do the parsing.
+from serverlog_analyser.config import JOB_QUEUE_PATH
+from serverlog_analyser.job_queue import JobQueue, remove_upload
+job_queue = JobQueue(JOB_QUEUE_PATH) if JOB_QUEUE_PATH else None
+
 # set event loop on startup so JobManager can schedule coroutines from worker threads
 @app.on_event("startup")
 async def _set_job_manager_loop():
@@ -137,6 +144,18 @@ async def upload(request: 'Request', file: UploadFile = File(...), background_ta
     if not file.filename:
         raise HTTPException(status_code=400, detail="No file uploaded")
 
+    if job_queue is not None:
+        try:
+            tmp_path = await uploader.save(file)
+        except Exception as e:
+            logger.exception("Upload failed or interrupted: %s", e)
+            raise HTTPException(status_code=500, detail=f"Upload failed or interrupted: {e}")
+        saved_bytes = os.path.getsize(tmp_path)
+        # absolute path so workers started from another directory find the file
+        job_id = job_queue.enqueue(file.filename, os.path.abspath(tmp_path), saved_bytes)
+        logger.info("Upload complete for job %s: %s bytes (queued)", job_id, saved_bytes)
+        return JSONResponse({"job_id": job_id, "status": "queued", "uploaded_bytes": saved_bytes})
+
     # create job and reserve it before upload
     job = job_manager.create_job(file.filename)
     try:
@@ -165,8 +184,67 @@ async def upload(request: 'Request', file: UploadFile = File(...), background_ta
 
     return JSONResponse({"job_id": job.job_id, "status": job.status, "uploaded_bytes": job.saved_bytes})
 
+@app.post("/upload/raw")
+async def upload_raw(request: Request, filename: str, background_tasks: BackgroundTasks = None):
+    """Upload with the raw body (`application/octet-stream`, optionally `Content-Encoding: gzip`).
+
+    The body is streamed straight into `uploads/` (no multipart spooling) and the response
+    carries per-upload throughput / disk I/O figures in `upload_stats`.
+    """
+    content_type = request.headers.get("content-type", "application/octet-stream").split(";")[0].strip()
+    if content_type != "application/octet-stream":
+        raise HTTPException(status_code=415, detail="Expected application/octet-stream body")
+    if not filename:
+        raise HTTPException(status_code=400, detail="No filename given")
+    content_encoding = request.headers.get("content-encoding")
+    if content_encoding and content_encoding.strip().lower() not in ("identity", "gzip"):
+        raise HTTPException(status_code=415, detail=f"Unsupported Content-Encoding: {content_encoding}")
+
+    logger.info("Raw upload started: filename=%s content-length=%s content-encoding=%s",
+                filename, request.headers.get("content-length"), content_encoding)
+
+    job = None if job_queue is not None else job_manager.create_job(filename)
+    try:
+        stats = await uploader.save_stream(request.stream(), filename, content_encoding)
+    except Exception as e:
+        logger.exception("Upload failed or interrupted: %s", e)
+        if job is not None:
+            job.status = "failed"
+            job.error = f"upload_error: {e}"
+        status_code = 400 if isinstance(e, (ValueError, zlib.error)) else 500
+        raise HTTPException(status_code=status_code, detail=f"Upload failed or interrupted: {e}")
+    tmp_path = stats.pop("path")
+
+    if job_queue is not None:
+        job_id = job_queue.enqueue(filename, os.path.abspath(tmp_path), stats["bytes_written"])
+        logger.info("Upload complete for job %s: %s bytes (queued)", job_id, stats["bytes_written"])
+        return JSONResponse({"job_id": job_id, "status": "queued", "uploaded_bytes": stats["bytes_written"],
+                             "upload_stats": stats})
+
+    job.tmp_path = tmp_path
+    job.saved_bytes = stats["bytes_written"]
+    job.status = "uploaded"
+    logger.info("Upload complete for job %s: %s bytes", job.job_id, job.saved_bytes)
+
+    if background_tasks is not None:
+        background_tasks.add_task(job_manager.process_job, job.job_id)
+    else:
+        job_manager.process_job(job.job_id)
+
+    return JSONResponse({"job_id": job.job_id, "status": job.status, "uploaded_bytes": job.saved_bytes,
+                         "upload_stats": stats})
+
 @app.post("/jobs/{job_id}/cancel")
 async def cancel_job(job_id: str):
+    if job_queue is not None:
+        status = job_queue.request_cancel(job_id)
+        if status is None:
+            raise HTTPException(status_code=404, detail="Job not found")
+        logger.info("Cancel requested for job %s", job_id)
+        # a job cancelled before any worker claimed it will never be cleaned up by a worker
+        if status == "cancelled":
+            remove_upload(job_queue.get(job_id)["tmp_path"])
+        return JSONResponse({"job_id": job_id, "status": status})
     job = job_manager.get_job(job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
@@ -176,7 +254,12 @@ async def cancel_job(job_id: str):
     return JSONResponse({"job_id": job_id, "status": job.status})
 
 @app.get("/jobs/{job_id}")
-async def get_job(job_id: str):
+async def get_job(job_id: str, lease: bool = False):
+    if job_queue is not None:
+        record = job_queue.get(job_id)
+        if not record:
+            raise HTTPException(status_code=404, detail="Job not found")
+        return JobQueue.to_public(record, include_lease=lease)
     job = job_manager.get_job(job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
@@ -184,6 +267,8 @@ async def get_job(job_id: str):
 
 @app.get("/jobs")
 async def list_jobs():
+    if job_queue is not None:
+        return {record["job_id"]: JobQueue.to_public(record) for record in job_queue.list_jobs()}
     return {jid: job.to_dict() for jid, job in job_manager._jobs.items()}
 
 # ---------------------------------
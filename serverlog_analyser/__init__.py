@@ -1,5 +1,8 @@
 from .uploader import Uploader
 from .jobs import Job, JobManager
 from .parser import LogParser
+from .hll import HyperLogLog
+from .job_queue import JobQueue
+from .worker import Worker
 
-__all__ = ["Uploader", "Job", "JobManager", "LogParser"]
+__all__ = ["Uploader", "Job", "JobManager", "LogParser", "HyperLogLog", "JobQueue", "Worker"]
@@ -0,0 +1,9 @@
+"""Point d'entrée `python -m serverlog_analyser worker`."""
+import sys
+
+from .worker import main
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] != "worker":
+        sys.exit("usage: python -m serverlog_analyser worker [--queue PATH] [--worker-id ID]")
+    main(sys.argv[2:])
@@ -23,6 +23,26 @@ AGGREGATED_LIMIT: int = int(os.getenv("AGGREGATED_LIMIT", "500"))
 # --- Other useful defaults
 MAX_URL_TREE_DEPTH: int = int(os.getenv("MAX_URL_TREE_DEPTH", "10"))
 
+# --- Raw streaming upload (/upload/raw): request chunks are buffered up to this size before each disk write
+UPLOAD_WRITE_BUFFER_BYTES: int = int(os.getenv("UPLOAD_WRITE_BUFFER_BYTES", str(8 * 1024 * 1024)))
+
+# --- Distinct counts (HyperLogLog): 2**HLL_PRECISION bytes per sketch, one set per job and per interval
+HLL_PRECISION: int = int(os.getenv("HLL_PRECISION", "12"))
+DISTINCT_INTERVAL_SECONDS: int = int(os.getenv("DISTINCT_INTERVAL_SECONDS", "3600"))
+# serialized sketches per interval (~2 KB each, three per interval) make results much larger: opt-in
+DISTINCT_INTERVAL_SKETCHES: bool = _get_bool("DISTINCT_INTERVAL_SKETCHES", False)
+if not 4 <= HLL_PRECISION <= 16:
+    raise ValueError(f"HLL_PRECISION must be between 4 and 16, got {HLL_PRECISION}")
+if DISTINCT_INTERVAL_SECONDS <= 0:
+    raise ValueError(f"DISTINCT_INTERVAL_SECONDS must be > 0, got {DISTINCT_INTERVAL_SECONDS}")
+
+# --- Out-of-process workers (empty JOB_QUEUE_PATH keeps parsing inside the API process)
+JOB_QUEUE_PATH: str = os.getenv("JOB_QUEUE_PATH", "")
+JOB_LEASE_SECONDS: float = float(os.getenv("JOB_LEASE_SECONDS", "30"))
+JOB_MAX_ATTEMPTS: int = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+WORKER_HEARTBEAT_SECONDS: float = float(os.getenv("WORKER_HEARTBEAT_SECONDS", "5"))
+WORKER_POLL_SECONDS: float = float(os.getenv("WORKER_POLL_SECONDS", "1"))
+
 # Helper: export a small dict usable by the frontend
 def as_frontend_dict():
     return {
@@ -0,0 +1,76 @@
+"""Module hll: estimateur HyperLogLog pour les comptes distincts (IPs, chemins, paires IP/chemin).
+
+Chaque sketch occupe 2**precision octets (4 Ko par défaut) quel que soit le nombre de valeurs,
+et deux sketches de même précision se fusionnent (max registre par registre), ce qui permet de
+combiner des shards ou des jobs différents.
+"""
+import base64
+import hashlib
+import math
+import zlib
+from typing import Iterable
+
+_SMALL_M_ALPHA = {16: 0.673, 32: 0.697, 64: 0.709}
+
+
+class HyperLogLog:
+    def __init__(self, precision: int = 12):
+        if not 4 <= precision <= 16:
+            raise ValueError(f"precision must be between 4 and 16, got {precision}")
+        self.precision = precision
+        self.m = 1 << precision
+        self.registers = bytearray(self.m)
+
+    @staticmethod
+    def hash(value: str) -> int:
+        """64-bit hash of a value; compute it once when adding to several sketches."""
+        return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "big")
+
+    def add_hash(self, h: int) -> None:
+        p = self.precision
+        idx = h >> (64 - p)
+        rest = h & ((1 << (64 - p)) - 1)
+        rank = (64 - p) - rest.bit_length() + 1
+        if rank > self.registers[idx]:
+            self.registers[idx] = rank
+
+    def add(self, value: str) -> None:
+        self.add_hash(self.hash(value))
+
+    def update(self, values: Iterable[str]) -> None:
+        for v in values:
+            self.add(v)
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        """Merge `other` into this sketch in place (union of both sets)."""
+        if other.precision != self.precision:
+            raise ValueError(f"cannot merge sketches of precision {self.precision} and {other.precision}")
+        self.registers = bytearray(max(a, b) for a, b in zip(self.registers, other.registers))
+        return self
+
+    def count(self) -> int:
+        m = self.m
+        # bias correction constant (Flajolet et al.); the closed form only holds for m >= 128
+        alpha = _SMALL_M_ALPHA.get(m, 0.7213 / (1 + 1.079 / m))
+        estimate = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        # small range correction (linear counting)
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+    def __len__(self) -> int:
+        return self.count()
+
+    def to_base64(self) -> str:
+        """Compact, JSON-friendly serialization (registers are mostly zeros for small sets)."""
+        return base64.b64encode(zlib.compress(bytes([self.precision]) + bytes(self.registers))).decode("ascii")
+
+    @classmethod
+    def from_base64(cls, data: str) -> "HyperLogLog":
+        raw = zlib.decompress(base64.b64decode(data))
+        hll = cls(raw[0])
+        if len(raw) != hll.m + 1:
+            raise ValueError("corrupted HyperLogLog sketch")
+        hll.registers = bytearray(raw[1:])
+        return hll
@@ -0,0 +1,260 @@
+"""Module job_queue: file d'attente SQLite partagée entre l'API et les workers.
+
+L'API y dépose les jobs, les workers (`python -m serverlog_analyser worker`) les
+réclament avec un bail (lease) prolongé par heartbeat. Les jobs dont le bail a
+expiré (worker planté) sont remis en file.
+"""
+import json
+import logging
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, List, Optional
+
+from .config import JOB_LEASE_SECONDS, JOB_MAX_ATTEMPTS
+from .jobs import new_job_id, JOB_PUBLIC_FIELDS
+
+logger = logging.getLogger("job_queue")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    filename TEXT NOT NULL,
+    tmp_path TEXT,
+    status TEXT NOT NULL,
+    progress REAL NOT NULL DEFAULT 0,
+    saved_bytes INTEGER,
+    bytes_read INTEGER,
+    lines_parsed INTEGER,
+    result TEXT,
+    error TEXT,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    worker_id TEXT,
+    lease_expires REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_status_created ON jobs (status, created_at);
+"""
+
+TERMINAL_STATUSES = ("done", "failed", "cancelled")
+
+
+def remove_upload(path: Optional[str]) -> None:
+    """Delete the uploaded file of a job that no worker will process (controlled by config)."""
+    from .config import DELETE_UPLOADS_AFTER_PROCESSING
+    if not (DELETE_UPLOADS_AFTER_PROCESSING and path):
+        return
+    try:
+        os.remove(path)
+        logger.info("Removed temporary file %s", path)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.exception("Failed to remove temporary file %s: %s", path, e)
+
+
+class JobQueue:
+    """Durable job queue backed by a single SQLite file (WAL mode)."""
+
+    def __init__(self, path: str, max_attempts: int = JOB_MAX_ATTEMPTS):
+        self.path = str(path)
+        self.max_attempts = max_attempts
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        # one short-lived connection per operation: safe across threads and processes
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+        d = dict(row)
+        d["result"] = json.loads(d["result"]) if d["result"] else None
+        d["cancel_requested"] = bool(d["cancel_requested"])
+        return d
+
+    @staticmethod
+    def to_public(record: Dict[str, Any], include_lease: bool = False) -> Dict[str, Any]:
+        """API view of a queue record: same keys as `Job.to_dict()`, no server paths."""
+        out = {k: record[k] for k in JOB_PUBLIC_FIELDS}
+        if include_lease:
+            out["lease"] = {
+                "worker_id": record["worker_id"],
+                "expires": record["lease_expires"],
+                "attempts": record["attempts"],
+            }
+        return out
+
+    def enqueue(self, filename: str, tmp_path: str, saved_bytes: Optional[int] = None) -> str:
+        job_id = new_job_id()
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (job_id, filename, tmp_path, status, saved_bytes, created_at, updated_at) "
+                "VALUES (?, ?, ?, 'queued', ?, ?, ?)",
+                (job_id, filename, tmp_path, saved_bytes, now, now),
+            )
+        logger.info("Enqueued job %s (file=%s)", job_id, filename)
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return self._to_dict(row) if row else None
+
+    def list_jobs(self) -> List[Dict[str, Any]]:
+        with self._connect() as conn:
+            rows = conn.execute("SELECT * FROM jobs ORDER BY created_at").fetchall()
+        return [self._to_dict(r) for r in rows]
+
+    def _requeue_expired(self, conn: sqlite3.Connection, now: float) -> List[str]:
+        """Must be called inside a write transaction. Returns the uploads of jobs that
+        reached a final state here, to be removed once the transaction is committed."""
+        finished = conn.execute(
+            "SELECT tmp_path FROM jobs WHERE lease_expires < ? AND "
+            "(status = 'cancelling' OR (status = 'processing' AND attempts >= ?))",
+            (now, self.max_attempts),
+        ).fetchall()
+        conn.execute(
+            "UPDATE jobs SET status = 'cancelled', worker_id = NULL, lease_expires = NULL, updated_at = ? "
+            "WHERE status = 'cancelling' AND lease_expires < ?",
+            (now, now),
+        )
+        conn.execute(
+            "UPDATE jobs SET status = 'failed', error = 'lease_expired: worker lost ' || attempts || ' time(s)', "
+            "worker_id = NULL, lease_expires = NULL, updated_at = ? "
+            "WHERE status = 'processing' AND lease_expires < ? AND attempts >= ?",
+            (now, now, self.max_attempts),
+        )
+        cur = conn.execute(
+            "UPDATE jobs SET status = 'queued', worker_id = NULL, lease_expires = NULL, updated_at = ? "
+            "WHERE status = 'processing' AND lease_expires < ?",
+            (now, now),
+        )
+        if cur.rowcount:
+            logger.warning("Re-queued %s job(s) with expired lease", cur.rowcount)
+        return [r["tmp_path"] for r in finished if r["tmp_path"]]
+
+    def requeue_expired(self) -> None:
+        """Re-queue (or fail, after `max_attempts`) jobs whose worker stopped heartbeating."""
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                finished = self._requeue_expired(conn, time.time())
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        for path in finished:
+            remove_upload(path)
+
+    def claim(self, worker_id: str, lease_seconds: float = JOB_LEASE_SECONDS) -> Optional[Dict[str, Any]]:
+        """Atomically take the oldest queued job for `worker_id`, or return None."""
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                finished = self._requeue_expired(conn, now)
+                row = conn.execute(
+                    "SELECT job_id FROM jobs WHERE status = 'queued' AND cancel_requested = 0 "
+                    "ORDER BY created_at LIMIT 1"
+                ).fetchone()
+                claimed = None
+                if row is not None:
+                    conn.execute(
+                        # progress counters of a previous (crashed) attempt are reset with the progress
+                        "UPDATE jobs SET status = 'processing', progress = 0, bytes_read = NULL, lines_parsed = NULL, "
+                        "worker_id = ?, lease_expires = ?, attempts = attempts + 1, updated_at = ? WHERE job_id = ?",
+                        (worker_id, now + lease_seconds, now, row["job_id"]),
+                    )
+                    claimed = conn.execute("SELECT * FROM jobs WHERE job_id = ?", (row["job_id"],)).fetchone()
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        for path in finished:
+            remove_upload(path)
+        if claimed is None:
+            return None
+        logger.info("Worker %s claimed job %s", worker_id, claimed["job_id"])
+        return self._to_dict(claimed)
+
+    def heartbeat(self, job_id: str, worker_id: str, lease_seconds: float = JOB_LEASE_SECONDS,
+                  progress: Optional[float] = None, bytes_read: Optional[int] = None,
+                  lines_parsed: Optional[int] = None) -> bool:
+        """Extend the lease and store progress. Returns False if the lease was lost."""
+        now = time.time()
+        with self._connect() as conn:
+            cur = conn.execute(
+                "UPDATE jobs SET lease_expires = ?, updated_at = ?, "
+                "progress = COALESCE(?, progress), bytes_read = COALESCE(?, bytes_read), "
+                "lines_parsed = COALESCE(?, lines_parsed) "
+                "WHERE job_id = ? AND worker_id = ? AND status IN ('processing', 'cancelling')",
+                (now + lease_seconds, now, progress, bytes_read, lines_parsed, job_id, worker_id),
+            )
+        return cur.rowcount == 1
+
+    def finish(self, job_id: str, worker_id: str, status: str,
+               result: Optional[Dict[str, Any]] = None, error: Optional[str] = None,
+               bytes_read: Optional[int] = None, lines_parsed: Optional[int] = None) -> bool:
+        """Store the final state (and final read totals) of a job still leased by `worker_id`."""
+        if status not in TERMINAL_STATUSES:
+            raise ValueError(f"not a terminal status: {status}")
+        now = time.time()
+        with self._connect() as conn:
+            cur = conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, "
+                "progress = CASE WHEN ? = 'done' THEN 1.0 ELSE progress END, "
+                "bytes_read = COALESCE(?, bytes_read), lines_parsed = COALESCE(?, lines_parsed), "
+                "worker_id = NULL, lease_expires = NULL, updated_at = ? "
+                "WHERE job_id = ? AND worker_id = ? AND status IN ('processing', 'cancelling')",
+                (status, json.dumps(result) if result is not None else None, error, status,
+                 bytes_read, lines_parsed, now, job_id, worker_id),
+            )
+        return cur.rowcount == 1
+
+    def release(self, job_id: str, worker_id: str) -> bool:
+        """Hand a job back to the queue (worker shutdown); the attempt is not counted."""
+        now = time.time()
+        with self._connect() as conn:
+            cur = conn.execute(
+                "UPDATE jobs SET status = 'queued', worker_id = NULL, lease_expires = NULL, "
+                "attempts = MAX(attempts - 1, 0), updated_at = ? "
+                "WHERE job_id = ? AND worker_id = ? AND status = 'processing'",
+                (now, job_id, worker_id),
+            )
+        return cur.rowcount == 1
+
+    def request_cancel(self, job_id: str) -> Optional[str]:
+        """Flag a job for cancellation and return its new status (None if unknown)."""
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute(
+                    "UPDATE jobs SET cancel_requested = 1, updated_at = ?, status = CASE status "
+                    "WHEN 'queued' THEN 'cancelled' WHEN 'processing' THEN 'cancelling' ELSE status END "
+                    "WHERE job_id = ?",
+                    (now, job_id),
+                )
+                row = conn.execute("SELECT status FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return row["status"] if row else None
+
+    def is_cancel_requested(self, job_id: str) -> bool:
+        with self._connect() as conn:
+            row = conn.execute("SELECT cancel_requested FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return bool(row and row["cancel_requested"])
@@ -7,6 +7,15 @@ from .parser import LogParser
 
 logger = logging.getLogger("jobs")
 
+
+# fields exposed by the API for a job (same shape for in-process and queued jobs)
+JOB_PUBLIC_FIELDS = ("job_id", "filename", "status", "progress", "saved_bytes",
+                     "bytes_read", "lines_parsed", "result", "error")
+
+
+def new_job_id() -> str:
+    return f"job-{uuid.uuid4().hex[:8]}"
+
 class Job:
     def __init__(self, job_id: str, filename: str, tmp_path: Optional[str] = None):
         self.job_id = job_id
@@ -26,17 +35,7 @@ class Job:
         self.status = "cancelling"
 
     def to_dict(self) -> Dict[str, Any]:
-        return {
-            "job_id": self.job_id,
-            "filename": self.filename,
-            "status": self.status,
-            "progress": self.progress,
-            "saved_bytes": self.saved_bytes,
-            "bytes_read": self.bytes_read,
-            "lines_parsed": self.lines_parsed,
-            "result": self.result,
-            "error": self.error,
-        }
+        return {k: getattr(self, k) for k in JOB_PUBLIC_FIELDS}
 
 class JobManager:
     def __init__(self):
@@ -49,7 +48,7 @@ class JobManager:
         self._loop = loop
 
     def create_job(self, filename: str, tmp_path: Optional[str] = None) -> Job:
-        job_id = f"job-{uuid.uuid4().hex[:8]}"
+        job_id = new_job_id()
         job = Job(job_id, filename, tmp_path)
         self._jobs[job_id] = job
         return job
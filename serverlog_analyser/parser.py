@@ -8,7 +8,27 @@ from datetime import datetime, timedelta
 from http import HTTPStatus
 from typing import List, Dict, Any, Optional
 import aiofiles
-from .config import TOP_N_IPS, TOP_N_PATHS, AGGREGATED_LIMIT
+from .config import (
+    TOP_N_IPS, TOP_N_PATHS, AGGREGATED_LIMIT,
+    HLL_PRECISION, DISTINCT_INTERVAL_SECONDS, DISTINCT_INTERVAL_SKETCHES,
+)
+from .hll import HyperLogLog
+
+_EPOCH = datetime(1970, 1, 1)
+# distinct counters: IPs, normalized paths and (IP, normalized path) pairs
+DISTINCT_KEYS = ("ips", "paths", "ip_paths")
+
+
+def _new_sketches() -> Dict[str, HyperLogLog]:
+    return {k: HyperLogLog(HLL_PRECISION) for k in DISTINCT_KEYS}
+
+
+def _sketches_summary(sketches: Dict[str, HyperLogLog], include_sketches: bool = True) -> Dict[str, Any]:
+    out: Dict[str, Any] = {k: sketches[k].count() for k in DISTINCT_KEYS}
+    if include_sketches:
+        # serialized sketches so results can be merged across shards / jobs (HyperLogLog.from_base64)
+        out["sketches"] = {k: sketches[k].to_base64() for k in DISTINCT_KEYS}
+    return out
 
 class LogParser:
     pattern = re.compile(r"^(?P<ip>\S+) .* \"(?P<method>\S+) (?P<path>\S+) .*\" (?P<status>\d{3}) (?P<size>\S+)(?: (?P<duration>\d+(?:\.\d+)?))?.*$")
@@ -25,6 +45,9 @@ class LogParser:
         # track earliest / latest timestamps when present in the log lines
         min_ts = None
         max_ts = None
+        # approximate distinct counts for the whole file and per time interval
+        distinct = _new_sketches()
+        distinct_by_interval: Dict[int, Dict[str, HyperLogLog]] = {}
 
         total_bytes = 0
         try:
@@ -52,6 +75,7 @@ class LogParser:
                     bytes_read += len(line)
 
                 # extract ISO-like timestamp if present (e.g. "2026-01-23 12:00:01")
+                ts = None
                 ts_search = re.search(r'(?P<ts>\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})', line)
                 if ts_search:
                     try:
@@ -61,7 +85,7 @@ class LogParser:
                         if max_ts is None or ts > max_ts:
                             max_ts = ts
                     except Exception:
-                        pass
+                        ts = None
 
                 m = LogParser.pattern.match(line)
                 if not m:
@@ -83,6 +107,16 @@ class LogParser:
                     norm = norm[:-1]
                 norm_paths[norm] += 1
                 ips[ip] += 1
+                hashes = (HyperLogLog.hash(ip), HyperLogLog.hash(norm), HyperLogLog.hash(f"{ip} {norm}"))
+                for key, h in zip(DISTINCT_KEYS, hashes):
+                    distinct[key].add_hash(h)
+                if ts is not None:
+                    bucket = int((ts - _EPOCH).total_seconds()) // DISTINCT_INTERVAL_SECONDS
+                    bucket_sketches = distinct_by_interval.get(bucket)
+                    if bucket_sketches is None:
+                        bucket_sketches = distinct_by_interval[bucket] = _new_sketches()
+                    for key, h in zip(DISTINCT_KEYS, hashes):
+                        bucket_sketches[key].add_hash(h)
                 d = m.group("duration")
                 if d:
                     try:
@@ -141,6 +175,13 @@ class LogParser:
             except Exception:
                 status_messages[code_str] = ""
 
+        intervals = []
+        for bucket in sorted(distinct_by_interval):
+            start = _EPOCH + timedelta(seconds=bucket * DISTINCT_INTERVAL_SECONDS)
+            entry = {"start": start.strftime('%Y-%m-%d %H:%M:%S')}
+            entry.update(_sketches_summary(distinct_by_interval[bucket], DISTINCT_INTERVAL_SKETCHES))
+            intervals.append(entry)
+
         return {
             "total_requests": total,
             "status_counts": dict(status_counts),
@@ -153,4 +194,7 @@ class LogParser:
             "end_time": end_time_str,
             "duration_seconds": duration_seconds,
             "duration": str(timedelta(seconds=duration_seconds)),
+            "distinct": _sketches_summary(distinct),
+            "distinct_interval_seconds": DISTINCT_INTERVAL_SECONDS,
+            "distinct_by_interval": intervals,
         }
\ No newline at end of file
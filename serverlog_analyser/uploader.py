@@ -5,7 +5,10 @@ import pathlib
 import uuid
 import logging
 import os
-from typing import Optional
+import time
+import zlib
+from typing import AsyncIterator, Dict, Any, Optional
+from .config import UPLOAD_WRITE_BUFFER_BYTES
 
 logger = logging.getLogger("uploader")
 
@@ -14,11 +17,13 @@ class Uploader:
         self.uploads_dir = pathlib.Path(uploads_dir)
         self.uploads_dir.mkdir(parents=True, exist_ok=True)
 
+    def _dest_path(self, filename: str) -> pathlib.Path:
+        sanitized = pathlib.Path(filename).name
+        return self.uploads_dir / f"{uuid.uuid4().hex[:8]}_{sanitized}"
+
     async def save(self, upload: UploadFile) -> str:
         """Sauvegarde l'UploadFile dans `uploads/` et renvoie le chemin."""
-        sanitized = pathlib.Path(upload.filename).name
-        dest_name = f"{uuid.uuid4().hex[:8]}_{sanitized}"
-        dest_path = self.uploads_dir / dest_name
+        dest_path = self._dest_path(upload.filename)
         total_written = 0
         try:
             async with aiofiles.open(dest_path, "wb") as out_file:
@@ -37,3 +42,72 @@ class Uploader:
             raise
         logger.info("Saved upload to %s (%s bytes)", dest_path, total_written)
         return str(dest_path)
+
+    async def save_stream(self, chunks: AsyncIterator[bytes], filename: str,
+                          content_encoding: Optional[str] = None,
+                          buffer_size: int = UPLOAD_WRITE_BUFFER_BYTES) -> Dict[str, Any]:
+        """Écrit directement un corps de requête brut (`request.stream()`) dans `uploads/`.
+
+        Évite le double passage disque du multipart (spool python-multipart puis copie).
+        Le corps peut être compressé en gzip (`Content-Encoding: gzip`), il est alors
+        décompressé à la volée ; l'appelant valide l'encodage (seuls `identity` et `gzip`
+        sont gérés). Renvoie le chemin et les statistiques de l'upload.
+        """
+        encoding = (content_encoding or "identity").strip().lower()
+        # wbits=16+MAX_WBITS: gzip header and trailer
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS) if encoding == "gzip" else None
+
+        dest_path = self._dest_path(filename)
+        stats = {"bytes_received": 0, "bytes_written": 0, "write_calls": 0}
+        buf = bytearray()
+        started = time.perf_counter()
+
+        async def flush(out_file):
+            # one large write per `buffer_size` bytes instead of one per network chunk
+            await out_file.write(buf)
+            stats["bytes_written"] += len(buf)
+            stats["write_calls"] += 1
+            buf.clear()
+
+        try:
+            async with aiofiles.open(dest_path, "wb") as out_file:
+                async for chunk in chunks:
+                    stats["bytes_received"] += len(chunk)
+                    data = chunk
+                    while data:
+                        if decompressor is None:
+                            buf += data
+                            data = b""
+                        else:
+                            # bounded decompression so a small gzip body cannot blow up memory
+                            buf += decompressor.decompress(data, buffer_size)
+                            data = decompressor.unconsumed_tail
+                            if decompressor.eof and decompressor.unused_data:
+                                # concatenated gzip members (rotated / pigz logs): decode the next one.
+                                # at eof the leftover input is in unused_data (unconsumed_tail repeats it)
+                                data = decompressor.unused_data
+                                decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+                        if len(buf) >= buffer_size:
+                            await flush(out_file)
+                if decompressor is not None:
+                    buf += decompressor.flush()
+                    if not decompressor.eof:
+                        raise ValueError("truncated gzip stream")
+                if buf:
+                    await flush(out_file)
+        except Exception as e:
+            try:
+                dest_path.unlink()
+            except Exception:
+                pass
+            logger.exception("Error saving raw upload: %s", e)
+            raise
+        seconds = time.perf_counter() - started
+        stats.update({
+            "path": str(dest_path),
+            "content_encoding": encoding,
+            "seconds": round(seconds, 6),
+            "throughput_mb_s": round(stats["bytes_received"] / (1024 * 1024) / seconds, 3) if seconds > 0 else None,
+        })
+        logger.info("Saved raw upload to %s: %s", dest_path, stats)
+        return stats
@@ -0,0 +1,174 @@
+"""Module worker: processus de parsing hors de l'API, alimenté par `JobQueue`.
+
+Lancement : `JOB_QUEUE_PATH=jobs.db python -m serverlog_analyser worker`
+"""
+import asyncio
+import logging
+import os
+import signal
+import socket
+import time
+import uuid
+from typing import Dict, Any, Optional
+
+from .config import JOB_LEASE_SECONDS, WORKER_HEARTBEAT_SECONDS, WORKER_POLL_SECONDS
+from .job_queue import JobQueue
+from .parser import LogParser
+
+logger = logging.getLogger("worker")
+
+
+class Worker:
+    def __init__(self, queue: JobQueue, worker_id: Optional[str] = None,
+                 lease_seconds: float = JOB_LEASE_SECONDS,
+                 heartbeat_seconds: float = WORKER_HEARTBEAT_SECONDS,
+                 poll_seconds: float = WORKER_POLL_SECONDS):
+        self.queue = queue
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:4]}"
+        self.lease_seconds = lease_seconds
+        self.heartbeat_seconds = heartbeat_seconds
+        self.poll_seconds = poll_seconds
+        self._stopping = False
+        self._task: Optional[asyncio.Task] = None
+
+    def stop(self) -> None:
+        """Stop polling; a job being parsed is interrupted and handed back to the queue."""
+        self._stopping = True
+        if self._task is not None:
+            self._task.cancel()
+
+    async def _heartbeat_loop(self, job_id: str, state: Dict[str, Any]):
+        # keeps the lease alive, pushes progress and picks up cancel requests from the API
+        last_renewed = time.monotonic()
+        while True:
+            await asyncio.sleep(self.heartbeat_seconds)
+            try:
+                alive = self.queue.heartbeat(
+                    job_id, self.worker_id, self.lease_seconds,
+                    progress=state["progress"], bytes_read=state["bytes_read"], lines_parsed=state["lines_parsed"],
+                )
+                if alive:
+                    last_renewed = time.monotonic()
+                    if self.queue.is_cancel_requested(job_id):
+                        state["cancel_requested"] = True
+            except Exception as e:
+                # e.g. "database is locked": retry on the next tick while the lease may still be valid
+                logger.exception("Heartbeat failed for job %s: %s", job_id, e)
+                alive = time.monotonic() - last_renewed < self.lease_seconds
+            if not alive:
+                logger.warning("Worker %s lost lease on job %s", self.worker_id, job_id)
+                state["lease_lost"] = True
+                return
+
+    @staticmethod
+    def _update_progress(state: Dict[str, Any], value: Any):
+        if isinstance(value, dict):
+            for key in ("progress", "bytes_read", "lines_parsed"):
+                if key in value:
+                    state[key] = value[key]
+
+    async def process(self, record: Dict[str, Any]) -> Optional[str]:
+        """Parse a claimed job and write its outcome back. Returns the final status."""
+        job_id = record["job_id"]
+        state: Dict[str, Any] = {
+            "progress": 0.0, "bytes_read": None, "lines_parsed": None,
+            "cancel_requested": record.get("cancel_requested", False), "lease_lost": False,
+        }
+        logger.info("Worker %s starting job %s (file=%s)", self.worker_id, job_id, record["filename"])
+        heartbeat = asyncio.create_task(self._heartbeat_loop(job_id, state))
+        status, result, error = None, None, None
+        try:
+            result = await LogParser.parse_file(
+                record["tmp_path"],
+                progress_callback=lambda p: self._update_progress(state, p),
+                should_cancel=lambda: state["cancel_requested"] or state["lease_lost"],
+            )
+            status = "done"
+        except asyncio.CancelledError:
+            if state["lease_lost"]:
+                # another worker owns the job now: leave the file and the record alone
+                return None
+            if not state["cancel_requested"]:
+                # worker shutdown (SIGINT / SIGTERM), not a user cancel: put the job back and stop
+                self.queue.release(job_id, self.worker_id)
+                logger.info("Worker %s stopping, job %s re-queued", self.worker_id, job_id)
+                raise
+            logger.info("Job %s cancelled by user", job_id)
+            status = "cancelled"
+        except Exception as e:
+            logger.exception("Job processing failed: %s", e)
+            status, error = "failed", str(e)
+        finally:
+            heartbeat.cancel()
+
+        if not self.queue.finish(job_id, self.worker_id, status, result=result, error=error,
+                                 bytes_read=state["bytes_read"], lines_parsed=state["lines_parsed"]):
+            logger.warning("Worker %s could not store result of job %s (lease lost)", self.worker_id, job_id)
+            return None
+        logger.info("Job %s %s", job_id, status)
+
+        # remove the uploaded file once the job reached a final state (controlled by config)
+        try:
+            from .config import DELETE_UPLOADS_AFTER_PROCESSING
+            if DELETE_UPLOADS_AFTER_PROCESSING and record["tmp_path"] and os.path.exists(record["tmp_path"]):
+                os.remove(record["tmp_path"])
+                logger.info("Removed temporary file for job %s: %s", job_id, record["tmp_path"])
+        except Exception as e:
+            logger.exception("Failed to remove temporary file for job %s: %s", job_id, e)
+        return status
+
+    async def run_once(self) -> bool:
+        """Claim and process a single job. Returns False when the queue is empty."""
+        record = self.queue.claim(self.worker_id, self.lease_seconds)
+        if record is None:
+            return False
+        await self.process(record)
+        return True
+
+    async def run_forever(self):
+        logger.info("Worker %s polling %s", self.worker_id, self.queue.path)
+        self._task = asyncio.current_task()
+        try:
+            while not self._stopping:
+                try:
+                    if await self.run_once():
+                        continue
+                except Exception as e:
+                    logger.exception("Worker %s loop error: %s", self.worker_id, e)
+                await asyncio.sleep(self.poll_seconds)
+        except asyncio.CancelledError:
+            if not self._stopping:
+                raise
+        finally:
+            self._task = None
+        logger.info("Worker %s stopped", self.worker_id)
+
+
+def main(argv=None):
+    import argparse
+    from .config import JOB_QUEUE_PATH
+
+    ap = argparse.ArgumentParser(prog="serverlog_analyser worker", description="Run a log parsing worker")
+    ap.add_argument("--queue", default=JOB_QUEUE_PATH, help="SQLite job queue path (default: $JOB_QUEUE_PATH)")
+    ap.add_argument("--worker-id", default=None)
+    args = ap.parse_args(argv)
+    if not args.queue:
+        ap.error("no job queue: pass --queue or set JOB_QUEUE_PATH")
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    worker = Worker(JobQueue(args.queue), worker_id=args.worker_id)
+
+    async def _run():
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, worker.stop)
+            except NotImplementedError:
+                # Windows: SIGINT raises KeyboardInterrupt and asyncio.run cancels the worker task
+                pass
+        await worker.run_forever()
+
+    try:
+        asyncio.run(_run())
+    except KeyboardInterrupt:
+        logger.info("Worker %s stopped", worker.worker_id)
@@ -0,0 +1,57 @@
+import pytest
+
+from serverlog_analyser.hll import HyperLogLog
+
+
+def test_estimate_within_error_bounds():
+    hll = HyperLogLog(12)
+    hll.update(f"10.0.{i // 256}.{i % 256}" for i in range(50000))
+    # standard error is ~1.6% at precision 12
+    assert abs(hll.count() - 50000) / 50000 < 0.05
+    assert len(hll.registers) == 4096
+
+
+def test_merge_is_union():
+    a, b = HyperLogLog(), HyperLogLog()
+    a.update(str(i) for i in range(0, 3000))
+    b.update(str(i) for i in range(2000, 5000))
+    merged = HyperLogLog.from_base64(a.to_base64()).merge(b)
+    assert abs(merged.count() - 5000) / 5000 < 0.05
+
+    with pytest.raises(ValueError):
+        a.merge(HyperLogLog(10))
+
+
+def test_serialization_roundtrip():
+    hll = HyperLogLog(10)
+    hll.update(["/a", "/b", "/a"])
+    restored = HyperLogLog.from_base64(hll.to_base64())
+    assert restored.precision == 10
+    assert restored.registers == hll.registers
+    assert restored.count() == 2
+
+
+@pytest.mark.parametrize("precision", [4, 5, 6, 7])
+def test_small_precision_uses_matching_alpha(precision):
+    # 1.04 / sqrt(m) standard error; averaged over several sets to keep the test stable
+    errors = []
+    for seed in range(100):
+        hll = HyperLogLog(precision)
+        hll.update(f"{seed}-{i}" for i in range(2000))
+        errors.append(hll.count() / 2000 - 1)
+    assert abs(sum(errors) / len(errors)) < 0.1
+
+
+def test_config_rejects_invalid_distinct_settings(monkeypatch):
+    import importlib
+    import serverlog_analyser.config as cfg
+
+    monkeypatch.setenv('DISTINCT_INTERVAL_SECONDS', '0')
+    with pytest.raises(ValueError):
+        importlib.reload(cfg)
+    monkeypatch.setenv('DISTINCT_INTERVAL_SECONDS', '3600')
+    monkeypatch.setenv('HLL_PRECISION', '20')
+    with pytest.raises(ValueError):
+        importlib.reload(cfg)
+    monkeypatch.delenv('HLL_PRECISION')
+    importlib.reload(cfg)
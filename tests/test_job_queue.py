@@ -0,0 +1,165 @@
+import asyncio
+import time
+
+from serverlog_analyser.job_queue import JobQueue
+from serverlog_analyser.worker import Worker
+
+
+def write_log(path, n=10):
+    path.write_text('\n'.join(['127.0.0.1 - - "GET /x HTTP/1.1" 200 12 0.1' for _ in range(n)]))
+    return path
+
+
+def test_claim_is_exclusive_and_fifo(tmp_path):
+    q = JobQueue(str(tmp_path / "jobs.db"))
+    first = q.enqueue("a.log", "/tmp/a.log")
+    second = q.enqueue("b.log", "/tmp/b.log")
+
+    assert q.claim("w1")["job_id"] == first
+    assert q.claim("w2")["job_id"] == second
+    assert q.claim("w3") is None
+    assert q.get(first)["status"] == "processing"
+    assert q.get(first)["worker_id"] == "w1"
+
+
+def test_expired_lease_is_requeued(tmp_path):
+    q = JobQueue(str(tmp_path / "jobs.db"), max_attempts=2)
+    job_id = q.enqueue("a.log", "/tmp/a.log")
+
+    q.claim("crashed", lease_seconds=0.01)
+    q.heartbeat(job_id, "crashed", lease_seconds=0.01, progress=0.5, bytes_read=100, lines_parsed=10)
+    time.sleep(0.05)
+    # the crashed worker lost its lease: another worker picks the job up from scratch
+    record = q.claim("w2", lease_seconds=0.01)
+    assert record["job_id"] == job_id
+    assert record["attempts"] == 2
+    assert (record["progress"], record["bytes_read"], record["lines_parsed"]) == (0, None, None)
+    assert not q.heartbeat(job_id, "crashed")
+    assert not q.finish(job_id, "crashed", "done", result={})
+
+    time.sleep(0.05)
+    q.requeue_expired()
+    record = q.get(job_id)
+    assert record["status"] == "failed"
+    assert record["error"].startswith("lease_expired")
+
+
+def test_cancel_queued_job(tmp_path):
+    q = JobQueue(str(tmp_path / "jobs.db"))
+    job_id = q.enqueue("a.log", "/tmp/a.log")
+
+    assert q.request_cancel(job_id) == "cancelled"
+    assert q.claim("w1") is None
+    assert q.request_cancel("job-missing") is None
+
+
+def test_worker_processes_job_and_stores_result(tmp_path, monkeypatch):
+    monkeypatch.setenv('DELETE_UPLOADS_AFTER_PROCESSING', '1')
+    import importlib
+    import serverlog_analyser.config as cfg
+    importlib.reload(cfg)
+
+    log = write_log(tmp_path / "small.log")
+    q = JobQueue(str(tmp_path / "jobs.db"))
+    log_size = log.stat().st_size
+    job_id = q.enqueue("small.log", str(log), log_size)
+
+    worker = Worker(q, worker_id="w1", heartbeat_seconds=60)
+    assert asyncio.run(worker.run_once()) is True
+    assert asyncio.run(worker.run_once()) is False
+
+    # a fresh queue object (another API replica) sees the result
+    record = JobQueue(str(tmp_path / "jobs.db")).get(job_id)
+    assert record["status"] == "done"
+    assert record["progress"] == 1.0
+    assert record["result"]["total_requests"] == 10
+    # final totals are stored with the result, not only by a (possibly never sent) heartbeat
+    assert record["lines_parsed"] == 10
+    assert record["bytes_read"] == log_size
+    assert not log.exists()
+
+
+def test_worker_stop_requeues_job_in_progress(tmp_path, monkeypatch):
+    monkeypatch.setenv('DELETE_UPLOADS_AFTER_PROCESSING', '1')
+    import importlib
+    import serverlog_analyser.config as cfg
+    importlib.reload(cfg)
+
+    log = write_log(tmp_path / "big.log", n=200000)
+    q = JobQueue(str(tmp_path / "jobs.db"))
+    job_id = q.enqueue("big.log", str(log))
+    worker = Worker(q, worker_id="w1", heartbeat_seconds=0.01)
+
+    async def scenario():
+        task = asyncio.create_task(worker.run_forever())
+        while q.get(job_id)["status"] != "processing":
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.05)
+        worker.stop()
+        await task
+
+    asyncio.run(scenario())
+
+    record = q.get(job_id)
+    assert (record["status"], record["worker_id"], record["attempts"]) == ("queued", None, 0)
+    assert log.exists()
+
+
+def test_public_view_matches_in_process_job(tmp_path):
+    from serverlog_analyser.jobs import Job
+
+    q = JobQueue(str(tmp_path / "jobs.db"))
+    job_id = q.enqueue("a.log", "/srv/uploads/a.log")
+    q.claim("w1")
+
+    public = JobQueue.to_public(q.get(job_id))
+    assert public.keys() == Job(job_id, "a.log").to_dict().keys()
+    assert "/srv/uploads/a.log" not in str(public)
+    lease = JobQueue.to_public(q.get(job_id), include_lease=True)["lease"]
+    assert (lease["worker_id"], lease["attempts"]) == ("w1", 1)
+
+
+def test_expired_jobs_in_final_state_remove_upload(tmp_path, monkeypatch):
+    monkeypatch.setenv('DELETE_UPLOADS_AFTER_PROCESSING', '1')
+    import importlib
+    import serverlog_analyser.config as cfg
+    importlib.reload(cfg)
+
+    failed_log = write_log(tmp_path / "failed.log")
+    cancelled_log = write_log(tmp_path / "cancelled.log")
+    q = JobQueue(str(tmp_path / "jobs.db"), max_attempts=1)
+    failed = q.enqueue("failed.log", str(failed_log))
+    cancelled = q.enqueue("cancelled.log", str(cancelled_log))
+    q.claim("crashed", lease_seconds=0.01)
+    q.claim("crashed", lease_seconds=0.01)
+    q.request_cancel(cancelled)
+
+    time.sleep(0.05)
+    assert q.claim("w2") is None
+    assert q.get(failed)["status"] == "failed"
+    assert q.get(cancelled)["status"] == "cancelled"
+    assert not failed_log.exists()
+    assert not cancelled_log.exists()
+
+
+def test_heartbeat_errors_are_retried_then_stop_the_parse(tmp_path):
+    import sqlite3
+
+    log = write_log(tmp_path / "big.log", n=200000)
+    q = JobQueue(str(tmp_path / "jobs.db"))
+    job_id = q.enqueue("big.log", str(log))
+    calls = []
+
+    def locked(*args, **kwargs):
+        calls.append(1)
+        raise sqlite3.OperationalError("database is locked")
+
+    # the heartbeat keeps failing: the worker must give up once its lease can no longer be valid
+    q.heartbeat = locked
+    worker = Worker(q, worker_id="w1", lease_seconds=0.2, heartbeat_seconds=0.01)
+    assert asyncio.run(worker.run_once()) is True
+
+    assert len(calls) > 1
+    # the parse was abandoned without storing a result: the job is left to lease expiry
+    assert q.get(job_id)["status"] == "processing"
+    assert log.exists()
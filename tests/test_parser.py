@@ -75,3 +75,26 @@ def test_status_messages_are_populated(tmp_path):
     assert res['status_counts'].get('404') == 1
     assert res['status_messages'].get('200') == 'OK'
     assert res['status_messages'].get('404') == 'Not Found'
+
+
+def test_distinct_counts_per_job_and_interval(tmp_path):
+    p = tmp_path / "distinct.log"
+    lines = [
+        '2026-01-23 12:00:01 192.0.2.10 - - "GET /a?x=1 HTTP/1.1" 200 123 0.11',
+        '2026-01-23 12:10:02 192.0.2.11 - - "GET /a/ HTTP/1.1" 200 123 0.12',
+        '2026-01-23 13:00:03 192.0.2.10 - - "GET /b HTTP/1.1" 200 123 0.13',
+        '2026-01-23 13:05:03 192.0.2.10 - - "GET /b HTTP/1.1" 200 123 0.13',
+    ]
+    p.write_text("\n".join(lines))
+
+    res = asyncio.run(LogParser.parse_file(str(p)))
+    distinct = res['distinct']
+    assert (distinct['ips'], distinct['paths'], distinct['ip_paths']) == (2, 2, 3)
+
+    intervals = res['distinct_by_interval']
+    assert [i['start'] for i in intervals] == ['2026-01-23 12:00:00', '2026-01-23 13:00:00']
+    assert (intervals[0]['ips'], intervals[0]['paths'], intervals[0]['ip_paths']) == (2, 1, 2)
+    assert (intervals[1]['ips'], intervals[1]['paths'], intervals[1]['ip_paths']) == (1, 1, 1)
+    # only the whole-job sketches are serialized by default (DISTINCT_INTERVAL_SKETCHES)
+    assert set(distinct['sketches']) == {'ips', 'paths', 'ip_paths'}
+    assert all('sketches' not in i for i in intervals)
@@ -0,0 +1,58 @@
+import asyncio
+import gzip
+
+import pytest
+
+from serverlog_analyser.uploader import Uploader
+
+
+async def _chunks(data, size):
+    for i in range(0, len(data), size):
+        yield data[i:i + size]
+
+
+def test_save_stream_buffers_writes(tmp_path):
+    data = b'127.0.0.1 - - "GET /x HTTP/1.1" 200 12 0.1\n' * 1000
+    up = Uploader(tmp_path)
+
+    stats = asyncio.run(up.save_stream(_chunks(data, 1000), "access.log", buffer_size=16 * 1024))
+    with open(stats["path"], "rb") as f:
+        assert f.read() == data
+    assert stats["bytes_received"] == stats["bytes_written"] == len(data)
+    # 44 network chunks of 1 KB, but only a handful of 16 KB disk writes
+    assert stats["write_calls"] == -(-len(data) // (16 * 1024))
+    assert stats["content_encoding"] == "identity"
+
+
+def test_save_stream_gzip(tmp_path):
+    data = b'127.0.0.1 - - "GET /x HTTP/1.1" 200 12 0.1\n' * 5000
+    body = gzip.compress(data)
+    up = Uploader(tmp_path)
+
+    stats = asyncio.run(up.save_stream(_chunks(body, 512), "access.log", "gzip", buffer_size=8192))
+    with open(stats["path"], "rb") as f:
+        assert f.read() == data
+    assert stats["bytes_received"] == len(body)
+    assert stats["bytes_written"] == len(data)
+
+
+def test_save_stream_gzip_multi_member(tmp_path):
+    a = b'127.0.0.1 - - "GET /a HTTP/1.1" 200 12 0.1\n' * 3000
+    b = b'127.0.0.2 - - "GET /b HTTP/1.1" 200 12 0.1\n' * 3000
+    body = gzip.compress(a) + gzip.compress(b)
+    up = Uploader(tmp_path)
+
+    # small chunks so member boundaries fall both inside and between chunks
+    for chunk_size in (7, 512, len(body)):
+        stats = asyncio.run(up.save_stream(_chunks(body, chunk_size), "access.log", "gzip", buffer_size=8192))
+        with open(stats["path"], "rb") as f:
+            assert f.read() == a + b
+
+
+def test_save_stream_truncated_gzip_is_removed(tmp_path):
+    body = gzip.compress(b"x" * 10000)[:-10]
+    up = Uploader(tmp_path)
+
+    with pytest.raises(ValueError):
+        asyncio.run(up.save_stream(_chunks(body, 100), "access.log", "gzip"))
+    assert list(tmp_path.iterdir()) == []